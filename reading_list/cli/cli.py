@@ -3,14 +3,17 @@ from typing import List
 import click
 
 from reading_list.core.application.commands import (AddEntryCommandHandler,
-                                                    ListEntriesCommandHandler)
+                                                    DedupeCommandHandler,
+                                                    ListEntriesCommandHandler,
+                                                    StatsCommandHandler)
 from reading_list.core.application.inputs import InputEventFactory
 from reading_list.core.dependencies.bootstrapper import (ADependencyInjectionBootstrapper,
                                                          NaiveDependencyInjectionBootstrapper)
 from reading_list.core.dependencies.dependency_injection import (ADependencyInjectionContainer,
                                                                  NaiveDependencyInjectionContainer)
 from reading_list.core.domain.entities import ReadingEntry
-from reading_list.shared.config import DEFAULT_CONFIGS, AConfig, initialize_custom_configs
+from reading_list.shared.config import (DEFAULT_CONFIGS, AConfig, ConfigurationError,
+                                        initialize_custom_configs)
 
 
 class AppStarter:
@@ -31,11 +34,14 @@ APP_STARTER = AppStarter()
 @click.option('-C', '--configuration',
               help='Path to a configuration JSON file')
 def cli(configuration: str) -> None:
-    if configuration:
-        configs = initialize_custom_configs(configuration)
-        APP_STARTER.setup_di_with_configs(configs)
-    else:
-        APP_STARTER.setup_di_with_configs(DEFAULT_CONFIGS)
+    try:
+        if configuration:
+            configs = initialize_custom_configs(configuration)
+            APP_STARTER.setup_di_with_configs(configs)
+        else:
+            APP_STARTER.setup_di_with_configs(DEFAULT_CONFIGS)
+    except ConfigurationError as error:
+        raise click.ClickException(f'Invalid configuration: {error}') from error
 
 
 @cli.command()
@@ -50,6 +56,8 @@ def add(title: str, link: str) -> None:
     result = handler.handle(data)
     if result.is_ok():
         click.echo('Ok.')
+        for similar_title in result.data.get('similar_titles', []):
+            click.echo(f'Warning: similar to an existing entry "{similar_title}".', err=True)
     else:
         click.echo('Could not add an entry.', err=True)
 
@@ -67,5 +75,34 @@ def list() -> None:
         click.echo('Could not retrieve entries.', err=True)
 
 
+@cli.command()
+def stats() -> None:
+    data = InputEventFactory.make_data_input_event({})
+    handler = StatsCommandHandler(APP_STARTER.di_container)
+    result = handler.handle(data)
+    if result.is_ok():
+        for key, value in result.data['stats'].items():
+            click.echo(f'{key}: {value}')
+    else:
+        click.echo('Could not retrieve stats.', err=True)
+
+
+@cli.command()
+@click.option('-s', '--threshold', type=float,
+              help='Minimal similarity (0..1) of titles to report them as near-duplicates')
+def dedupe(threshold: float) -> None:
+    data = InputEventFactory.make_data_input_event(dict(threshold=threshold))
+    handler = DedupeCommandHandler(APP_STARTER.di_container)
+    result = handler.handle(data)
+    if result.is_ok():
+        clusters: List[List[str]] = result.data['clusters']
+        for cluster in clusters:
+            click.echo(f'-> {len(cluster)} similar entries:')
+            for title in cluster:
+                click.echo(f'   {title}')
+    else:
+        click.echo('Could not find near-duplicate entries.', err=True)
+
+
 if __name__ == '__main__':
     cli()
@@ -1,10 +1,11 @@
-from typing import List
+from typing import List, Optional, cast
 
 from reading_list.core.application.inputs import DataInputEvent
 from reading_list.core.application.results import AResult, ErrorResult, SuccessResult
 from reading_list.core.dependencies.dependency_injection import ADependencyInjectionContainer
 from reading_list.core.dependencies.keys import DependencyInjectionEntryKeys
 from reading_list.core.domain.entities import ReadingEntry, ReadingEntryStruct
+from reading_list.shared.config import DEFAULT_CONFIGS, Config
 
 
 class BaseHandler:
@@ -14,6 +15,25 @@ class BaseHandler:
     def _own_handle(self, event: DataInputEvent) -> AResult:
         raise NotImplementedError()
 
+    def _get_configs(self) -> Config:
+        """Examples:
+
+            1. BaseHandler::_get_configs returns the app configs
+            >>> configs = Config()
+            >>> BaseHandler(dict(app_configs=configs))._get_configs() is configs
+            True
+
+            2. BaseHandler::_get_configs returns the default configs if none are registered
+            >>> BaseHandler(dict())._get_configs() is DEFAULT_CONFIGS
+            True
+        """
+        try:
+            configs = cast(Optional[Config], self._di.get(
+                DependencyInjectionEntryKeys.APP_CONFIGS))
+        except ValueError:
+            configs = None
+        return configs or DEFAULT_CONFIGS
+
     def handle(self, event: DataInputEvent) -> AResult:
         """Examples:
 
@@ -86,17 +106,41 @@ class AddEntryCommandHandler(BaseHandler):
             >>> result = command_handler._own_handle(mock_event)
             >>> isinstance(result, ErrorResult)
             True
+
+            5. AddEntryCommandHandler::_own_handle
+                returns the similar titles if the similarity check is enabled
+            >>> from reading_list.shared.config import Config, SimilarityConfig
+            >>> reset_mocks()
+            >>> configs = Config()
+            >>> configs.similarity = SimilarityConfig()
+            >>> configs.similarity.check_on_add = True
+            >>> di['app_configs'] = configs
+            >>> mock_factory.struct_to_entity.return_value.title = 'Clean Code'
+            >>> mock_persistence.save.return_value = True
+            >>> mock_persistence.find_similar_titles.return_value = ['Clean Code!']
+            >>> result = command_handler._own_handle(mock_event)
+            >>> mock_persistence.find_similar_titles.assert_called_once_with(
+            ...     'Clean Code', configs.similarity.threshold)
+            >>> result.data['similar_titles']
+            ['Clean Code!']
+            >>> DEFAULT_CONFIGS.similarity.check_on_add
+            False
         """
         factory = self._di.get(
             DependencyInjectionEntryKeys.READING_ENTRY_FACTORY)
         persistency = self._di.get(
             DependencyInjectionEntryKeys.PERSISTENCE_DRIVER)
+        similarity_configs = self._get_configs().similarity
         reading_entry = factory.struct_to_entity(event.data)
         clean_reading_entry_struct = factory.entity_to_struct(
             reading_entry)
+        # Checked before saving, so the entry does not match itself
+        similar_titles: List[str] = persistency.find_similar_titles(
+            reading_entry.title, similarity_configs.threshold
+        ) if similarity_configs.check_on_add else []
         # TODO: add check for possible input errors: already exists / invalid data etc...
         result = persistency.save(clean_reading_entry_struct)
-        return SuccessResult() if result else ErrorResult()
+        return SuccessResult(data={'similar_titles': similar_titles}) if result else ErrorResult()
 
 
 class ListEntriesCommandHandler(BaseHandler):
@@ -137,3 +181,66 @@ class ListEntriesCommandHandler(BaseHandler):
         reading_entries: List[ReadingEntry] = list(
             map(factory.struct_to_entity, reading_entry_structs))
         return SuccessResult(data={'entries': reading_entries})
+
+
+class StatsCommandHandler(BaseHandler):
+    def _own_handle(self, _: DataInputEvent) -> AResult:
+        """Examples:
+
+            >>> from unittest.mock import MagicMock
+            >>> mock_persistence = MagicMock()
+            >>> di = dict(persistence_driver=mock_persistence)
+            >>> mock_event = None
+            >>> command_handler = StatsCommandHandler(di)
+
+            1. StatsCommandHandler::_own_handle
+                returns the stats of the persistency driver as data of the result
+            >>> expected_stats = {'entry_count': 3}
+            >>> mock_persistence.stats.return_value = expected_stats
+            >>> result = command_handler._own_handle(mock_event)
+            >>> result.data['stats']
+            {'entry_count': 3}
+        """
+        persistency = self._di.get(
+            DependencyInjectionEntryKeys.PERSISTENCE_DRIVER)
+        return SuccessResult(data={'stats': persistency.stats()})
+
+
+class DedupeCommandHandler(BaseHandler):
+    def _own_handle(self, event: DataInputEvent) -> AResult:
+        """Examples:
+
+            >>> from unittest.mock import MagicMock
+            >>> mock_persistence = MagicMock()
+            >>> di = dict(persistence_driver=mock_persistence)
+            >>> command_handler = DedupeCommandHandler(di)
+            >>> def reset_mocks():
+            ...     mock_persistence.reset_mock()
+
+            1. DedupeCommandHandler::_own_handle
+                returns the clusters of near-duplicate titles as data of the result
+            >>> reset_mocks()
+            >>> expected_clusters = [['Clean Code', 'Clean Code!']]
+            >>> mock_persistence.dedupe.return_value = expected_clusters
+            >>> result = command_handler._own_handle(DataInputEvent(data={'threshold': 0.8}))
+            >>> mock_persistence.dedupe.assert_called_once_with(0.8)
+            >>> result.data['clusters']
+            [['Clean Code', 'Clean Code!']]
+
+            2. DedupeCommandHandler::_own_handle uses the configured threshold by default
+            >>> reset_mocks()
+            >>> _ = command_handler._own_handle(DataInputEvent())
+            >>> mock_persistence.dedupe.assert_called_once_with(
+            ...     DEFAULT_CONFIGS.similarity.threshold)
+
+            3. DedupeCommandHandler::_own_handle uses an explicit zero threshold
+            >>> reset_mocks()
+            >>> _ = command_handler._own_handle(DataInputEvent(data={'threshold': 0.0}))
+            >>> mock_persistence.dedupe.assert_called_once_with(0.0)
+        """
+        persistency = self._di.get(
+            DependencyInjectionEntryKeys.PERSISTENCE_DRIVER)
+        threshold = event.data.get('threshold')
+        if threshold is None:
+            threshold = self._get_configs().similarity.threshold
+        return SuccessResult(data={'clusters': persistency.dedupe(threshold)})
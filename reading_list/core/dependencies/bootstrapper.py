@@ -1,18 +1,43 @@
 
 from abc import ABC, abstractmethod
-from typing import Any, Type
+from typing import Type, cast
 
 from reading_list.core.dependencies.dependency_injection import ADependencyInjectionContainer
 from reading_list.core.dependencies.keys import DependencyInjectionEntryKeys
 from reading_list.core.domain.entities import ReadingEntryFactory
+from reading_list.core.domain.links import LinkCanonicalizer
 from reading_list.core.persistency.tinydb_driver import TinyDbDriver
-from reading_list.shared.config import AConfig
+from reading_list.shared.config import AConfig, Config
 
 
 class BootstrapperValueFactories:
     @staticmethod
-    def READING_ENTRY_FACTORY(_: Any) -> Type[ReadingEntryFactory]:
-        return ReadingEntryFactory
+    def READING_ENTRY_FACTORY(
+            container: ADependencyInjectionContainer) -> Type[ReadingEntryFactory]:
+        """Examples:
+
+            >>> from reading_list.shared.config import Config
+
+            1. Configures the link canonicalizer of the factory with the app configs
+            >>> di = dict(app_configs=Config())
+            >>> factory = BootstrapperValueFactories.READING_ENTRY_FACTORY(di)
+            >>> isinstance(factory.link_canonicalizer, LinkCanonicalizer)
+            True
+
+            2. Leaves the default factory as it is
+            >>> factory.link_canonicalizer is ReadingEntryFactory.link_canonicalizer
+            False
+        """
+        links_config = cast(
+            Config, container.get(DependencyInjectionEntryKeys.APP_CONFIGS)).links
+        return ReadingEntryFactory.with_link_canonicalizer(LinkCanonicalizer(
+            stripped_query_params=links_config.stripped_query_params,
+            sort_query_keys=links_config.sort_query_keys,
+            lowercase_host=links_config.lowercase_host,
+            strip_www=links_config.strip_www,
+            strip_trailing_slash=links_config.strip_trailing_slash,
+            upgrade_scheme=links_config.upgrade_scheme,
+            memo_size=links_config.memo_size))
 
     @staticmethod
     def PERSISTENCE_DRIVER(container: ADependencyInjectionContainer) -> TinyDbDriver:
@@ -44,7 +69,7 @@ class NaiveDependencyInjectionBootstrapper(ADependencyInjectionBootstrapper):
                                     configs)
         self._di_container.register(
             DependencyInjectionEntryKeys.READING_ENTRY_FACTORY,
-            BootstrapperValueFactories.READING_ENTRY_FACTORY(self))
+            BootstrapperValueFactories.READING_ENTRY_FACTORY(self._di_container))
         self._di_container.register(
             DependencyInjectionEntryKeys.PERSISTENCE_DRIVER,
             BootstrapperValueFactories.PERSISTENCE_DRIVER(self._di_container))
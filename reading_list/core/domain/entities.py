@@ -1,5 +1,7 @@
 from dataclasses import dataclass
-from typing import TypedDict
+from typing import Type, TypedDict
+
+from reading_list.core.domain.links import DEFAULT_LINK_CANONICALIZER, LinkCanonicalizer
 
 
 @dataclass
@@ -14,9 +16,25 @@ class ReadingEntryStruct(TypedDict):
 
 
 class ReadingEntryFactory:
+    link_canonicalizer: LinkCanonicalizer = DEFAULT_LINK_CANONICALIZER
 
-    @staticmethod
-    def make_new_entry(title: str, link: str = "") -> ReadingEntry:
+    @classmethod
+    def with_link_canonicalizer(
+            cls, link_canonicalizer: LinkCanonicalizer) -> Type['ReadingEntryFactory']:
+        """Examples:
+
+            1. Returns a factory using the link canonicalizer, leaving this factory as it is
+            >>> canonicalizer = LinkCanonicalizer(upgrade_scheme=False)
+            >>> factory = ReadingEntryFactory.with_link_canonicalizer(canonicalizer)
+            >>> factory.make_new_entry('foo', 'http://example.com/').link
+            'http://example.com'
+            >>> ReadingEntryFactory.link_canonicalizer is DEFAULT_LINK_CANONICALIZER
+            True
+        """
+        return type(cls.__name__, (cls,), {'link_canonicalizer': link_canonicalizer})
+
+    @classmethod
+    def make_new_entry(cls, title: str, link: str = "") -> ReadingEntry:
         """Examples:
 
             Entry with title and link
@@ -24,6 +42,12 @@ class ReadingEntryFactory:
             >>> f't: {result.title}, l: {result.link}'
             't: foo, l: bar'
 
+            Entry with a canonicalized link
+            >>> result = ReadingEntryFactory.make_new_entry(
+            ...     'foo', 'http://www.example.com/bar/?utm_source=feed')
+            >>> f't: {result.title}, l: {result.link}'
+            't: foo, l: https://example.com/bar'
+
             Entry without link
             >>> result = ReadingEntryFactory.make_new_entry('foo')
             >>> f't: {result.title}, l: {result.link}'
@@ -36,7 +60,7 @@ class ReadingEntryFactory:
             TypeError: ...
 
         """
-        return ReadingEntry(title, link)
+        return ReadingEntry(title, cls.link_canonicalizer.canonicalize(link))
 
     @staticmethod
     def entity_to_struct(entry: ReadingEntry) -> ReadingEntryStruct:
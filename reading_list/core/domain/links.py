@@ -0,0 +1,150 @@
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+from urllib.parse import unquote_plus, urlsplit, urlunsplit
+
+DEFAULT_STRIPPED_QUERY_PARAMS: Tuple[str, ...] = (
+    'utm_*', 'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid',
+    'mc_cid', 'mc_eid', 'igshid', '_hsenc', '_hsmi')
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+class LinkCanonicalizer:
+    """Rewrites links into a canonical form, so that links which differ
+    only by tracking parameters, scheme, trailing slashes or `www.` are equal.
+
+    Stripped query params are matched by name, a trailing `*` matches by prefix.
+    The results are memoized in bounded LRU caches.
+    """
+
+    def __init__(self,
+                 stripped_query_params: Sequence[str] = DEFAULT_STRIPPED_QUERY_PARAMS,
+                 sort_query_keys: bool = True,
+                 lowercase_host: bool = True,
+                 strip_www: bool = True,
+                 strip_trailing_slash: bool = True,
+                 upgrade_scheme: bool = True,
+                 memo_size: Optional[int] = 4096) -> None:
+        self._stripped_names = frozenset(
+            param.lower() for param in stripped_query_params if not param.endswith('*'))
+        self._stripped_prefixes = tuple(
+            param[:-1].lower() for param in stripped_query_params if param.endswith('*'))
+        self._sort_query_keys = sort_query_keys
+        self._lowercase_host = lowercase_host
+        self._strip_www = strip_www
+        self._strip_trailing_slash = strip_trailing_slash
+        self._upgrade_scheme = upgrade_scheme
+        self._canonicalize_cached = lru_cache(maxsize=memo_size)(self._canonicalize)
+        self._canonicalize_netloc = lru_cache(maxsize=memo_size)(self._own_canonicalize_netloc)
+        self._is_stripped_param = lru_cache(maxsize=memo_size)(self._own_is_stripped_param)
+
+    def canonicalize(self, link: str) -> str:
+        """Examples:
+
+            >>> canonicalizer = LinkCanonicalizer()
+
+            1. Strips tracking params and sorts the remaining query keys
+            >>> canonicalizer.canonicalize('https://example.com/a?utm_source=x&b=2&a=1&fbclid=y')
+            'https://example.com/a?a=1&b=2'
+
+            2. Lowercases the host and strips `www.`, the trailing slash and the default port
+            >>> canonicalizer.canonicalize('https://WWW.Example.com:443/Some/Path/')
+            'https://example.com/Some/Path'
+
+            3. Upgrades the scheme so http and https links are equal
+            >>> canonicalizer.canonicalize('http://example.com/')
+            'https://example.com'
+            >>> canonicalizer.canonicalize('http://example.com:80/x')
+            'https://example.com/x'
+
+            4. Keeps the scheme of links with an explicit non-default port
+            >>> canonicalizer.canonicalize('http://example.com:8080/x')
+            'http://example.com:8080/x'
+            >>> canonicalizer.canonicalize('http://example.com:443/x')
+            'http://example.com:443/x'
+            >>> canonicalizer.canonicalize('https://example.com:\u0661/x')
+            'https://example.com:\u0661/x'
+
+            5. Keeps the remaining query params as they were written
+            >>> canonicalizer.canonicalize('https://example.com/a?ref&q=a%20b&utm_source=x')
+            'https://example.com/a?q=a%20b&ref'
+
+            6. Leaves links without a host and empty links as they are
+            >>> canonicalizer.canonicalize('bar')
+            'bar'
+            >>> canonicalizer.canonicalize('')
+            ''
+
+            7. Rules can be switched off
+            >>> LinkCanonicalizer(
+            ...     stripped_query_params=[], sort_query_keys=False, strip_www=False
+            ... ).canonicalize('https://www.example.com/?utm_source=x&b=2&a=1')
+            'https://www.example.com?utm_source=x&b=2&a=1'
+        """
+        return self._canonicalize_cached(link.strip())
+
+    def canonicalize_many(self, links: Iterable[str]) -> Iterator[str]:
+        """Examples:
+
+            >>> canonicalizer = LinkCanonicalizer()
+
+            1. Lazily canonicalizes a stream of links, preserving their order
+            >>> links = ['http://www.a.com/', 'https://b.com/?utm_medium=x', 'http://www.a.com/']
+            >>> list(canonicalizer.canonicalize_many(links))
+            ['https://a.com', 'https://b.com', 'https://a.com']
+
+            2. Repeated links are served from the memo
+            >>> canonicalizer._canonicalize_cached.cache_info().hits
+            1
+        """
+        canonicalize = self.canonicalize
+        for link in links:
+            yield canonicalize(link)
+
+    def _canonicalize(self, link: str) -> str:
+        parts = urlsplit(link)
+        if not parts.netloc:
+            return link
+        scheme = parts.scheme.lower()
+        # The default port is stripped by the original scheme,
+        # a link with an explicit non-default port may not be served over https
+        netloc, port = self._canonicalize_netloc(parts.netloc, scheme)
+        if self._upgrade_scheme and scheme == 'http' and not port:
+            scheme = 'https'
+        path = parts.path
+        if self._strip_trailing_slash:
+            path = path.rstrip('/')
+        query = self._canonicalize_query(parts.query)
+        return urlunsplit((scheme, netloc, path, query, parts.fragment))
+
+    def _own_canonicalize_netloc(self, netloc: str, scheme: str) -> Tuple[str, str]:
+        userinfo, _, hostport = netloc.rpartition('@')
+        host, separator, port = hostport.rpartition(':')
+        if not separator or not (port.isascii() and port.isdigit()):
+            # No port, or the colon belongs to an IPv6 host
+            host, port = hostport, ''
+        if self._lowercase_host:
+            host = host.lower()
+        if self._strip_www and host.lower().startswith('www.'):
+            host = host[len('www.'):]
+        if port and int(port) == DEFAULT_PORTS.get(scheme):
+            port = ''
+        hostport = f'{host}:{port}' if port else host
+        return (f'{userinfo}@{hostport}' if userinfo else hostport), port
+
+    def _canonicalize_query(self, query: str) -> str:
+        if not query:
+            return query
+        # The kept params are not re-encoded, so `?ref` does not turn into `?ref=`
+        params = [param for param in query.split('&')
+                  if param and not self._is_stripped_param(unquote_plus(param.partition('=')[0]))]
+        if self._sort_query_keys:
+            params.sort(key=lambda param: param.partition('=')[::2])
+        return '&'.join(params)
+
+    def _own_is_stripped_param(self, key: str) -> bool:
+        lower_key = key.lower()
+        return lower_key in self._stripped_names or lower_key.startswith(self._stripped_prefixes)
+
+
+DEFAULT_LINK_CANONICALIZER = LinkCanonicalizer()
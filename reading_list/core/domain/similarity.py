@@ -0,0 +1,224 @@
+import re
+import struct
+from hashlib import blake2b, shake_128
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+STOP_WORDS = frozenset({'the', 'a', 'an'})
+BRACKETED_RE = re.compile(r'\([^)]*\)|\[[^\]]*\]')
+NON_WORD_RE = re.compile(r'[^\w\s]+')
+
+# Titles are candidates with a probability of 1 - (1 - J^rows)^bands for a Jaccard similarity J,
+# the cutoff (1 / bands)^(1 / rows) ~ 0.32 stays well below the configurable threshold
+MINHASH_BANDS = 10
+MINHASH_ROWS = 2
+# Every trigram is hashed once, a 4 byte slice of the digest stands for one hash function
+MINHASH_UNPACK = struct.Struct(f'<{MINHASH_BANDS * MINHASH_ROWS}I').unpack
+MINHASH_DIGEST_SIZE = 4 * MINHASH_BANDS * MINHASH_ROWS
+# A band key hashes the band number and its rows, as a signed 64 bit integer (e.g. for SQLite)
+BAND_PACK = struct.Struct(f'<{1 + MINHASH_ROWS}I').pack
+BAND_KEY_SIZE = 8
+
+
+def normalize_title(title: str) -> str:
+    """Examples:
+
+        1. normalize_title: ignores case, punctuation, articles, bracketed notes and word order
+        >>> normalize_title('The Pragmatic Programmer')
+        'pragmatic programmer'
+        >>> normalize_title('Pragmatic Programmer, The (2nd ed)')
+        'pragmatic programmer'
+    """
+    title = BRACKETED_RE.sub(' ', title.lower())
+    words = [word for word in NON_WORD_RE.sub(' ', title).split() if word not in STOP_WORDS]
+    return ' '.join(sorted(words))
+
+
+def title_trigrams(title: str) -> FrozenSet[str]:
+    """Examples:
+
+        1. title_trigrams: returns the character trigrams of the normalized title
+        >>> sorted(title_trigrams('The Cat'))
+        [' ca', 'at ', 'cat']
+    """
+    padded = f' {normalize_title(title)} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2)) or frozenset({padded})
+
+
+def jaccard(trigrams_a: FrozenSet[str], trigrams_b: FrozenSet[str]) -> float:
+    """Examples:
+
+        >>> jaccard(frozenset('abc'), frozenset('bcd'))
+        0.5
+    """
+    union = len(trigrams_a | trigrams_b)
+    return len(trigrams_a & trigrams_b) / union if union else 0.0
+
+
+def band_keys(trigrams: FrozenSet[str]) -> List[int]:
+    """MinHash signature of the trigrams, split into LSH bands:
+    titles sharing any band key are candidates for being similar.
+
+    Examples:
+
+        1. band_keys: returns one key per band
+        >>> len(band_keys(title_trigrams('The Pragmatic Programmer'))) == MINHASH_BANDS
+        True
+
+        2. band_keys: returns the same keys for the same trigrams
+        >>> keys_a = band_keys(title_trigrams('The Pragmatic Programmer'))
+        >>> keys_b = band_keys(title_trigrams('Pragmatic Programmer, The (2nd ed)'))
+        >>> keys_a == keys_b
+        True
+
+        3. band_keys: returns stable keys, so they can be persisted
+        >>> band_keys(frozenset({'cat'}))[0]
+        378041851573778149
+
+        4. band_keys: shares a key for nearly all the titles similar around the threshold
+        >>> import random
+        >>> rng = random.Random(0)
+        >>> def make_word():
+        ...     return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz')
+        ...                    for _ in range(rng.randint(3, 9)))
+        >>> def make_similar_pair():
+        ...     words = [make_word() for _ in range(rng.randint(3, 6))]
+        ...     similar_words = list(words)
+        ...     i = rng.randrange(len(words))
+        ...     similar_words[i] = make_word()
+        ...     return ' '.join(words), ' '.join(similar_words)
+        >>> def share_key(title_a, title_b):
+        ...     keys_a = band_keys(title_trigrams(title_a))
+        ...     keys_b = band_keys(title_trigrams(title_b))
+        ...     return any(key_a == key_b for key_a, key_b in zip(keys_a, keys_b))
+        >>> pairs = [make_similar_pair() for _ in range(1000)]
+        >>> def found_share(low, high):
+        ...     found = [share_key(*pair) for pair in pairs
+        ...              if low <= jaccard(*map(title_trigrams, pair)) < high]
+        ...     return sum(found) / len(found)
+        >>> found_share(0.6, 0.7) >= 0.95, found_share(0.5, 0.6) >= 0.9
+        (True, True)
+    """
+    hashes = [MINHASH_UNPACK(shake_128(trigram.encode()).digest(MINHASH_DIGEST_SIZE))
+              for trigram in trigrams]
+    signature = list(map(min, zip(*hashes)))
+    return [int.from_bytes(
+        blake2b(BAND_PACK(band, *signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]),
+                digest_size=BAND_KEY_SIZE).digest(),
+        byteorder='little', signed=True)
+        for band in range(MINHASH_BANDS)]
+
+
+def filter_similar(trigrams: FrozenSet[str],
+                   candidates: Iterable[Tuple[int, str]],
+                   threshold: float) -> List[Tuple[int, str]]:
+    """Examples:
+
+        1. filter_similar: keeps the candidates similar to the trigrams, ordered by id
+        >>> filter_similar(title_trigrams('Clean Code'),
+        ...                [(2, 'Clean Code!'), (1, 'Refactoring'), (0, 'The Clean Code')], 0.6)
+        [(0, 'The Clean Code'), (2, 'Clean Code!')]
+    """
+    return [(doc_id, title) for doc_id, title in sorted(candidates)
+            if jaccard(trigrams, title_trigrams(title)) >= threshold]
+
+
+class TitleSimilarityIndex:
+    """MinHash LSH index of titles, finding near-duplicates without
+    comparing every pair of titles.
+    """
+
+    def __init__(self) -> None:
+        self._titles: Dict[int, str] = {}
+        self._buckets: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def add(self, doc_id: int, title: str, keys: Optional[List[int]] = None) -> List[int]:
+        """Examples:
+
+            >>> index = TitleSimilarityIndex()
+
+            1. TitleSimilarityIndex::add indexes the title and returns its band keys
+            >>> keys = index.add(1, 'The Pragmatic Programmer')
+            >>> len(index), len(keys) == MINHASH_BANDS
+            (1, True)
+
+            2. TitleSimilarityIndex::add reuses the band keys if given
+            >>> _ = index.add(2, 'Refactoring', keys=[-1])
+            >>> index._buckets[-1]
+            [2]
+        """
+        if keys is None:
+            keys = band_keys(title_trigrams(title))
+        self._titles[doc_id] = title
+        for key in keys:
+            self._buckets.setdefault(key, []).append(doc_id)
+        return keys
+
+    def find_similar(self, title: str, threshold: float) -> List[Tuple[int, str]]:
+        """Examples:
+
+            >>> index = TitleSimilarityIndex()
+            >>> _ = index.add(1, 'The Pragmatic Programmer')
+            >>> _ = index.add(2, 'Clean Code')
+
+            1. TitleSimilarityIndex::find_similar returns the near-duplicate titles
+            >>> index.find_similar('Pragmatic Programmer, The (2nd ed)', 0.6)
+            [(1, 'The Pragmatic Programmer')]
+
+            2. TitleSimilarityIndex::find_similar returns nothing for a new title
+            >>> index.find_similar('Structure and Interpretation of Computer Programs', 0.6)
+            []
+        """
+        trigrams = title_trigrams(title)
+        candidates = {doc_id
+                      for key in band_keys(trigrams)
+                      for doc_id in self._buckets.get(key, ())}
+        return filter_similar(
+            trigrams, [(doc_id, self._titles[doc_id]) for doc_id in candidates], threshold)
+
+    def clusters(self, threshold: float) -> List[List[Tuple[int, str]]]:
+        """Examples:
+
+            >>> index = TitleSimilarityIndex()
+            >>> _ = index.add(1, 'The Pragmatic Programmer')
+            >>> _ = index.add(2, 'Clean Code')
+            >>> _ = index.add(3, 'Pragmatic Programmer, The (2nd ed)')
+            >>> _ = index.add(4, 'Clean Code!')
+
+            1. TitleSimilarityIndex::clusters groups the near-duplicate titles
+            >>> index.clusters(0.6)
+            [[(1, 'The Pragmatic Programmer'), (3, 'Pragmatic Programmer, The (2nd ed)')], \
+[(2, 'Clean Code'), (4, 'Clean Code!')]]
+        """
+        parents: Dict[int, int] = {}
+
+        def find(doc_id: int) -> int:
+            root = doc_id
+            while parents.get(root, root) != root:
+                root = parents[root]
+            parents[doc_id] = root
+            return root
+
+        trigrams_cache: Dict[int, FrozenSet[str]] = {}
+
+        def trigrams_of(doc_id: int) -> FrozenSet[str]:
+            if doc_id not in trigrams_cache:
+                trigrams_cache[doc_id] = title_trigrams(self._titles[doc_id])
+            return trigrams_cache[doc_id]
+
+        for bucket in self._buckets.values():
+            for i, doc_id_a in enumerate(bucket):
+                for doc_id_b in bucket[i + 1:]:
+                    root_a, root_b = find(doc_id_a), find(doc_id_b)
+                    if root_a == root_b:
+                        continue
+                    if jaccard(trigrams_of(doc_id_a), trigrams_of(doc_id_b)) >= threshold:
+                        parents[root_b] = root_a
+
+        groups: Dict[int, List[int]] = {}
+        for doc_id in parents:
+            groups.setdefault(find(doc_id), []).append(doc_id)
+        return sorted([[(doc_id, self._titles[doc_id]) for doc_id in sorted(group)]
+                       for group in groups.values() if len(group) > 1])
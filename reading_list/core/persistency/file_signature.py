@@ -0,0 +1,34 @@
+import os
+from typing import List
+
+# Size and modification time (in ns) of a file, a list so that it survives a JSON round trip
+FileSignature = List[int]
+
+
+def file_signature(location: str) -> FileSignature:
+    """Cheap identity of the file contents: the sidecar files keep the signature
+    of the database they were derived from, and are rebuilt once it changes.
+
+    Examples:
+
+        >>> import tempfile
+        >>> location = os.path.join(tempfile.mkdtemp(), 'test.json')
+
+        1. file_signature: returns an empty signature for a missing file
+        >>> file_signature(location)
+        [0, 0]
+
+        2. file_signature: changes once the file is written
+        >>> with open(location, 'w') as file:
+        ...     _ = file.write('{}')
+        >>> signature = file_signature(location)
+        >>> with open(location, 'w') as file:
+        ...     _ = file.write('{"_default": {}}')
+        >>> file_signature(location) == signature
+        False
+    """
+    try:
+        stat = os.stat(location)
+    except FileNotFoundError:
+        return [0, 0]
+    return [stat.st_size, stat.st_mtime_ns]
@@ -0,0 +1,177 @@
+import json
+from dataclasses import asdict, dataclass
+from typing import Iterable, Mapping, Optional, Tuple, TypedDict
+
+from reading_list.core.persistency.file_signature import FileSignature
+
+
+class StorageStatsStruct(TypedDict):
+    entry_count: int
+    file_size: int
+    average_document_size: float
+    average_id_size: float
+    last_write_duration: float
+    write_queue_size: int
+    title_index_size: int
+
+
+@dataclass
+class StorageCounters:
+    entry_count: int = 0
+    total_document_size: int = 0
+    total_id_size: int = 0
+    last_write_duration: float = 0.0
+
+
+class StorageStatsCounter:
+    """Keeps the storage counters up to date on every write
+    and persists them next to the database, so reading them needs no scan.
+
+    The counters are stored with the signature of the database file they describe,
+    and are re-read before every update: counters of another database state
+    (e.g. a deleted database, or a write of another process) are never used.
+    A `None` signature stands for writes which are not in the database file yet.
+    """
+
+    def __init__(self, location: str) -> None:
+        self._location = location
+
+    def _read(self) -> Tuple[Optional[FileSignature], Optional[StorageCounters]]:
+        try:
+            with open(self._location) as file:
+                stored = json.load(file)
+            return stored['db_signature'], StorageCounters(**stored['counters'])
+        except (OSError, ValueError, TypeError, KeyError):
+            # Missing or corrupted counters are rebuilt from the database on next use
+            return None, None
+
+    def _save(self, counters: StorageCounters, db_signature: Optional[FileSignature]) -> None:
+        with open(self._location, 'w') as file:
+            json.dump({'db_signature': db_signature, 'counters': asdict(counters)}, file)
+
+    def load(self, db_signature: Optional[FileSignature]) -> Optional[StorageCounters]:
+        """Examples:
+
+            >>> import os, tempfile
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.stats')
+            >>> counter = StorageStatsCounter(location)
+
+            1. StorageStatsCounter::load returns nothing if no counters are stored
+            >>> counter.load([1, 2]) is None
+            True
+
+            2. StorageStatsCounter::load returns the counters of the same database
+            >>> _ = counter.reset([(1, {'title': 'foo', 'link': ''})], [1, 2])
+            >>> counter.load([1, 2]).entry_count
+            1
+
+            3. StorageStatsCounter::load returns nothing for another database
+            >>> counter.load([0, 0]) is None
+            True
+        """
+        stored_signature, counters = self._read()
+        if counters is None or stored_signature != db_signature:
+            return None
+        return counters
+
+    def record_inserts(self,
+                       documents: Iterable[Tuple[int, Mapping[str, object]]],
+                       duration: float,
+                       db_signature_before: Optional[FileSignature],
+                       db_signature_after: Optional[FileSignature]) -> bool:
+        """Examples:
+
+            >>> import os, tempfile
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.stats')
+            >>> counter = StorageStatsCounter(location)
+            >>> _ = counter.reset([], [0, 0])
+
+            1. StorageStatsCounter::record_inserts adds the inserted documents to the counters
+            >>> counter.record_inserts([(123, {'title': 'foo', 'link': ''})], 0.5, [0, 0], [1, 2])
+            True
+            >>> counter.load([1, 2])
+            StorageCounters(entry_count=1, total_document_size=28, total_id_size=3, \
+last_write_duration=0.5)
+
+            2. StorageStatsCounter::record_inserts refuses to update the counters
+                of another database state, which have to be reset instead
+            >>> counter.record_inserts([(456, {'title': 'bar', 'link': ''})], 0.5, [0, 0], [3, 4])
+            False
+            >>> counter.load([1, 2]).entry_count
+            1
+        """
+        # Re-read, another process may have updated the counters in the meantime
+        stored_signature, counters = self._read()
+        if counters is None or stored_signature != db_signature_before:
+            return False
+        self._add(counters, documents)
+        counters.last_write_duration = duration
+        self._save(counters, db_signature_after)
+        return True
+
+    def reset(self,
+              documents: Iterable[Tuple[int, Mapping[str, object]]],
+              db_signature: Optional[FileSignature],
+              duration: Optional[float] = None) -> StorageCounters:
+        """Examples:
+
+            >>> import os, tempfile
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.stats')
+            >>> counter = StorageStatsCounter(location)
+            >>> _ = counter.reset([(1, {'title': 'foo', 'link': ''})], [1, 2], 0.5)
+
+            1. StorageStatsCounter::reset rebuilds the counters from all the documents
+            >>> counters = counter.reset(
+            ...     [(1, {'title': 'foo', 'link': ''}), (2, {'title': 'a', 'link': ''})], [3, 4])
+            >>> (counters.entry_count, counters.last_write_duration)
+            (2, 0.5)
+            >>> counter.load([3, 4]) == counters
+            True
+
+            2. StorageStatsCounter::reset records the duration of the last write if given
+            >>> counters = counter.reset([], [5, 6], 0.25)
+            >>> (counters.entry_count, counters.last_write_duration)
+            (0, 0.25)
+        """
+        _, stored_counters = self._read()
+        if duration is None:
+            duration = stored_counters.last_write_duration if stored_counters else 0.0
+        counters = StorageCounters(last_write_duration=duration)
+        self._add(counters, documents)
+        self._save(counters, db_signature)
+        return counters
+
+    def confirm(self, db_signature: FileSignature) -> None:
+        """Examples:
+
+            >>> import os, tempfile
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.stats')
+            >>> counter = StorageStatsCounter(location)
+            >>> _ = counter.reset([(1, {'title': 'foo', 'link': ''})], None)
+
+            1. StorageStatsCounter::confirm ties the counters of not yet written documents
+                to the database file, once they are written
+            >>> counter.confirm([1, 2])
+            >>> counter.load([1, 2]).entry_count
+            1
+        """
+        stored_signature, counters = self._read()
+        if counters is not None and stored_signature is None:
+            self._save(counters, db_signature)
+
+    def _add(self,
+             counters: StorageCounters,
+             documents: Iterable[Tuple[int, Mapping[str, object]]]) -> None:
+        for doc_id, document in documents:
+            counters.entry_count += 1
+            counters.total_document_size += self.document_size(document)
+            counters.total_id_size += self.id_size(doc_id)
+
+    @staticmethod
+    def document_size(document: Mapping[str, object]) -> int:
+        return len(json.dumps(document).encode())
+
+    @staticmethod
+    def id_size(doc_id: int) -> int:
+        # Document ids are stored as decimal string keys
+        return len(str(doc_id))
@@ -0,0 +1,231 @@
+import importlib
+import json
+import os
+import sys
+import zlib
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from tinydb.middlewares import CachingMiddleware
+from tinydb.storages import JSONStorage, Storage, touch
+
+from reading_list.shared.config import ConfigurationError
+
+
+def _import_optional(name: str) -> Optional[ModuleType]:
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+orjson = _import_optional('orjson')
+msgpack = _import_optional('msgpack')
+
+
+class StorageOptions:
+    JSON = 'json'
+    FAST_JSON = 'fast_json'
+    BINARY = 'binary'
+
+
+class BytesFileStorage(Storage):
+    """TinyDB storage keeping the whole database in a single file,
+    encoded with the `_dumps` and decoded with the `_loads` codec.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        touch(path, create_dirs=False)
+        self._handle = open(path, mode='r+b')
+
+    @staticmethod
+    def _dumps(data: Dict[str, Dict[str, Any]]) -> bytes:
+        raise NotImplementedError()
+
+    @staticmethod
+    def _loads(raw: bytes) -> Dict[str, Dict[str, Any]]:
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def read(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        self._handle.seek(0)
+        raw = self._handle.read()
+        # An empty file makes TinyDB initialize the database
+        return self._loads(raw) if raw else None
+
+    def write(self, data: Dict[str, Dict[str, Any]]) -> None:
+        self._handle.seek(0)
+        self._handle.write(self._dumps(data))
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.truncate()
+
+
+class FastJSONStorage(BytesFileStorage):
+    """Examples:
+
+        >>> import tempfile
+        >>> location = os.path.join(tempfile.mkdtemp(), 'test.json')
+        >>> data = {'_default': {'1': {'title': 'foo', 'link': 'bar'}}}
+
+        1. Reads back the written data
+        >>> storage = FastJSONStorage(location)
+        >>> storage.write(data)
+        >>> storage.read() == data
+        True
+
+        2. Stays compatible with the default JSON storage
+        >>> JSONStorage(location).read() == data
+        True
+    """
+
+    @staticmethod
+    def _dumps(data: Dict[str, Dict[str, Any]]) -> bytes:
+        if orjson is not None:
+            return bytes(orjson.dumps(data))
+        return json.dumps(data, separators=(',', ':')).encode()
+
+    @staticmethod
+    def _loads(raw: bytes) -> Dict[str, Dict[str, Any]]:
+        if orjson is not None:
+            return dict(orjson.loads(raw))
+        return dict(json.loads(raw))
+
+
+Codec = Tuple[Callable[[Dict[str, Dict[str, Any]]], bytes],
+              Callable[[bytes], Dict[str, Dict[str, Any]]]]
+
+
+def _dumps_zlib_json(data: Dict[str, Dict[str, Any]]) -> bytes:
+    return zlib.compress(json.dumps(data, separators=(',', ':')).encode())
+
+
+def _loads_zlib_json(raw: bytes) -> Dict[str, Dict[str, Any]]:
+    return dict(json.loads(zlib.decompress(raw)))
+
+
+BINARY_CODECS: Dict[str, Codec] = {'zlib-json': (_dumps_zlib_json, _loads_zlib_json)}
+if msgpack is not None:
+    packb, unpackb = msgpack.packb, msgpack.unpackb
+    BINARY_CODECS['msgpack'] = (lambda data: bytes(packb(data)),
+                                lambda raw: dict(unpackb(raw)))
+
+
+class BinaryStorage(BytesFileStorage):
+    """Compact binary storage: msgpack when it is installed,
+    otherwise zlib compressed JSON.
+
+    The file starts with a header naming the codec it was written with,
+    so it stays readable when the installed packages change.
+
+    Examples:
+
+        >>> import tempfile
+        >>> location = os.path.join(tempfile.mkdtemp(), 'test.db')
+        >>> data = {'_default': {'1': {'title': 'foo', 'link': 'bar'}}}
+
+        1. Reads back the written data
+        >>> storage = BinaryStorage(location)
+        >>> storage.write(data)
+        >>> storage.read() == data
+        True
+
+        2. Reads an empty file as an empty database
+        >>> storage.write({})
+        >>> storage.read()
+        {}
+
+        3. Reads the data with the codec named in the header
+        >>> with open(location, 'wb') as file:
+        ...     _ = file.write(BinaryStorage.HEADER + b'zlib-json\\n' + _dumps_zlib_json(data))
+        >>> BinaryStorage(location).read() == data
+        True
+
+        4. Raises a ConfigurationError for a file written with an unavailable codec
+        >>> with open(location, 'wb') as file:
+        ...     _ = file.write(BinaryStorage.HEADER + b'bson\\n')
+        >>> BinaryStorage(location).read()
+        Traceback (most recent call last):
+            ...
+        reading_list.shared.config.ConfigurationError: ...
+    """
+    HEADER = b'READING-LIST-DB '
+    CODEC = 'msgpack' if 'msgpack' in BINARY_CODECS else 'zlib-json'
+
+    @classmethod
+    def _dumps(cls, data: Dict[str, Dict[str, Any]]) -> bytes:
+        dumps, _ = BINARY_CODECS[cls.CODEC]
+        return cls.HEADER + cls.CODEC.encode() + b'\n' + dumps(data)
+
+    @classmethod
+    def _loads(cls, raw: bytes) -> Dict[str, Dict[str, Any]]:
+        if not raw.startswith(cls.HEADER):
+            raise ConfigurationError('The database file is not a binary storage file.')
+        codec, _, payload = raw[len(cls.HEADER):].partition(b'\n')
+        try:
+            _, loads = BINARY_CODECS[codec.decode()]
+        except KeyError as error:
+            raise ConfigurationError(
+                f'The database file is encoded with "{codec.decode()}", '
+                f'which is not available (install it or switch the storage).') from error
+        return loads(payload)
+
+
+class DeferredWritesMiddleware(CachingMiddleware):
+    """Serves reads from memory and writes the database to the storage
+    only on close (or on an explicit flush).
+
+    Examples:
+
+        >>> import tempfile
+        >>> location = os.path.join(tempfile.mkdtemp(), 'test.json')
+        >>> data = {'_default': {'1': {'title': 'foo', 'link': 'bar'}}}
+
+        1. Defers the writes until close
+        >>> storage = DeferredWritesMiddleware(JSONStorage)(location)
+        >>> storage.write(data)
+        >>> JSONStorage(location).read() is None
+        True
+        >>> storage.close()
+        >>> JSONStorage(location).read() == data
+        True
+    """
+    WRITE_CACHE_SIZE = sys.maxsize
+
+
+STORAGES: Dict[str, Callable[..., Storage]] = {
+    StorageOptions.JSON: JSONStorage,
+    StorageOptions.FAST_JSON: FastJSONStorage,
+    StorageOptions.BINARY: BinaryStorage,
+}
+
+
+def make_storage(storage: str, deferred_writes: bool = False) -> Callable[..., Storage]:
+    """Examples:
+
+        1. make_storage: returns the storage known by the name
+        >>> make_storage('binary') is BinaryStorage
+        True
+
+        2. make_storage: wraps the storage into the deferred writes middleware if asked
+        >>> isinstance(make_storage('json', deferred_writes=True), DeferredWritesMiddleware)
+        True
+
+        3. make_storage: raises a ConfigurationError naming the known storages
+        >>> make_storage('msgpack')
+        Traceback (most recent call last):
+            ...
+        reading_list.shared.config.ConfigurationError: Provided storage "msgpack" is unknown, \
+use one of: json, fast_json, binary.
+    """
+    try:
+        storage_cls = STORAGES[storage]
+    except KeyError as error:
+        raise ConfigurationError(f'Provided storage "{storage}" is unknown, '
+                                 f'use one of: {", ".join(STORAGES)}.') from error
+    if deferred_writes:
+        return DeferredWritesMiddleware(storage_cls)  # type: ignore
+    return storage_cls
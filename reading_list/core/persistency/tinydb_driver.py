@@ -1,12 +1,23 @@
-from typing import List, Optional, cast
+import atexit
+import os
+import time
+from typing import Dict, List, Mapping, Optional, Tuple, cast
 
 from tinydb import TinyDB
+from tinydb.middlewares import CachingMiddleware
 from tinydb.table import Document
 
 from reading_list.core.dependencies.dependency_injection import ADependencyInjectionContainer
 from reading_list.core.dependencies.keys import DependencyInjectionEntryKeys
 from reading_list.core.domain.entities import ReadingEntryStruct
-from reading_list.shared.config import DEFAULT_CONFIGS, Config
+from reading_list.core.domain.similarity import band_keys, title_trigrams
+from reading_list.core.persistency.file_signature import FileSignature, file_signature
+from reading_list.core.persistency.stats import StorageStatsCounter, StorageStatsStruct
+from reading_list.core.persistency.storages import make_storage
+from reading_list.core.persistency.title_index import TitleIndexEntry, TitleIndexStore
+from reading_list.core.persistency.write_queue import WriteAheadLog, WriteBehindQueue
+from reading_list.shared.config import (DEFAULT_CONFIGS, Config, ConfigurationError,
+                                        TinyDbConfig, TinyDbWriteQueueConfig)
 
 
 class TinyDbDriver:
@@ -45,9 +56,142 @@ class TinyDbDriver:
         try:
             configs: Config = cast(
                 Config, self._di.get(DependencyInjectionEntryKeys.APP_CONFIGS))
-            self._db = TinyDB(configs.db.tiny_db.location)
+            self._location = configs.db.tiny_db.location
+            self._db = self._make_db(self._location, configs.db.tiny_db)
+        except ConfigurationError:
+            # A misconfiguration is reported, not silently replaced by the defaults
+            raise
         except Exception:
-            self._db = TinyDB(self.DEFAULT_DB_FILE)
+            configs = DEFAULT_CONFIGS
+            self._location = self.DEFAULT_DB_FILE
+            self._db = self._make_db(self._location, configs.db.tiny_db)
+        self._attach_sidecars(self._location)
+        self._deferred_writes = configs.db.tiny_db.deferred_writes
+        self._has_unwritten_documents = False
+        if self._deferred_writes:
+            # Registered before the write queue, so runs after it is flushed
+            atexit.register(self._close_deferred_db)
+        self._write_queue = self._make_write_queue(configs.db.tiny_db.write_queue)
+
+    def _attach_sidecars(self, location: str) -> None:
+        self._location = location
+        self._stats_counter = StorageStatsCounter(f'{location}.stats')
+        self._title_index_store = TitleIndexStore(f'{location}.titles')
+
+    @staticmethod
+    def _make_db(location: str, tiny_db_config: TinyDbConfig) -> TinyDB:
+        """Examples:
+
+            >>> import os, tempfile
+            >>> from reading_list.shared.config import TinyDbConfig
+            >>> def get_tiny_db_config(storage, deferred_writes=False):
+            ...     tiny_db_config = TinyDbConfig()
+            ...     tiny_db_config.storage = storage
+            ...     tiny_db_config.deferred_writes = deferred_writes
+            ...     return tiny_db_config
+            >>> def get_location():
+            ...     return os.path.join(tempfile.mkdtemp(), 'test.db')
+
+            1. TinyDbDriver::_make_db uses the configured storage
+            >>> db = TinyDbDriver._make_db(get_location(), get_tiny_db_config('binary'))
+            >>> type(db.storage).__name__
+            'BinaryStorage'
+
+            2. TinyDbDriver::_make_db defers the writes if configured
+            >>> db = TinyDbDriver._make_db(get_location(), get_tiny_db_config('json', True))
+            >>> type(db.storage).__name__
+            'DeferredWritesMiddleware'
+
+            3. TinyDbDriver::_make_db raises a ConfigurationError for an unknown storage
+            >>> TinyDbDriver._make_db(get_location(), get_tiny_db_config('msgpack'))
+            Traceback (most recent call last):
+                ...
+            reading_list.shared.config.ConfigurationError: ...
+        """
+        storage = make_storage(tiny_db_config.storage, tiny_db_config.deferred_writes)
+        return TinyDB(location, storage=storage)
+
+    def _close_deferred_db(self) -> None:
+        """Examples:
+
+            >>> import os, tempfile
+            >>> from unittest.mock import PropertyMock, patch
+            >>> from reading_list.core.persistency.storages import make_storage
+            >>> di = dict()
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.json')
+
+            1. TinyDbDriver::_close_deferred_db writes the documents
+                and ties the stats counters and the title index to the written database
+            >>> with patch.object(TinyDbDriver, '_db', new_callable=PropertyMock) as mock_db:
+            ...     mock_db.return_value = TinyDB(location, storage=make_storage('json', True))
+            ...     driver = TinyDbDriver(di)
+            ...     driver._attach_sidecars(location)
+            ...     driver._deferred_writes = True
+            ...     _ = driver._get_title_index_store()
+            ...     _ = driver.save(dict(title='foo', link=''))
+            ...     driver._close_deferred_db()
+            ...     (driver._stats_counter.load(file_signature(location)).entry_count,
+            ...      driver._title_index_store.is_current(file_signature(location)))
+            (1, True)
+        """
+        self._db.close()
+        if self._has_unwritten_documents:
+            self._has_unwritten_documents = False
+            db_signature = file_signature(self._location)
+            self._stats_counter.confirm(db_signature)
+            self._title_index_store.confirm(db_signature)
+
+    def _db_signature(self) -> Optional[FileSignature]:
+        # Deferred documents are not in the file yet, so the file does not identify the contents
+        return None if self._has_unwritten_documents else file_signature(self._location)
+
+    def _make_write_queue(
+            self, queue_config: TinyDbWriteQueueConfig) -> Optional[WriteBehindQueue]:
+        """Examples:
+
+            >>> import os, tempfile
+            >>> from reading_list.shared.config import TinyDbWriteQueueConfig
+            >>> di = dict()
+            >>> def get_queue_config(enabled):
+            ...     queue_config = TinyDbWriteQueueConfig()
+            ...     queue_config.enabled = enabled
+            ...     queue_config.wal_location = os.path.join(tempfile.mkdtemp(), 'test.wal')
+            ...     return queue_config
+            >>> def get_test_driver():
+            ...     driver = TinyDbDriver(di)
+            ...     driver._attach_sidecars(os.path.join(tempfile.mkdtemp(), 'test.json'))
+            ...     return driver
+
+            1. TinyDbDriver::_make_write_queue returns nothing if the queue is disabled
+            >>> driver = TinyDbDriver(di)
+            >>> driver._make_write_queue(get_queue_config(False)) is None
+            True
+
+            2. TinyDbDriver::_make_write_queue returns a queue if the queue is enabled
+            >>> driver = TinyDbDriver(di)
+            >>> isinstance(driver._make_write_queue(get_queue_config(True)), WriteBehindQueue)
+            True
+
+            3. TinyDbDriver::_make_write_queue keeps the log next to the database by default
+            >>> queue_config = get_queue_config(True)
+            >>> queue_config.wal_location = ''
+            >>> driver = get_test_driver()
+            >>> driver._make_write_queue(queue_config)._wal._location == f'{driver._location}.wal'
+            True
+        """
+        if not queue_config.enabled:
+            return None
+        # Every database has its own log, a shared log would replay entries into another one
+        wal_location = queue_config.wal_location or f'{self._location}.wal'
+        write_queue = WriteBehindQueue(WriteAheadLog(wal_location),
+                                       self._insert_documents,
+                                       queue_config.batch_size,
+                                       queue_config.flush_interval)
+        # Recover the writes acknowledged by a previous run, they are flushed once due,
+        # until then they stay in the log for the next run
+        write_queue.replay()
+        atexit.register(write_queue.flush_if_due)
+        return write_queue
 
     def save(self, reading_entry_struct: ReadingEntryStruct) -> bool:
         """Examples:
@@ -85,6 +229,8 @@ class TinyDbDriver:
             ...     mock_db_instance = MagicMock()
             ...     mock_db.return_value = mock_db_instance
             ...     return mock_db_instance
+            >>> record_write_patcher = patch.object(TinyDbDriver, '_record_write')
+            >>> mock_record_write = record_write_patcher.start()
 
             1. TinyDbDriver::_throwing_save
                 saves the reading entry struct as new Document with custom id
@@ -139,11 +285,379 @@ class TinyDbDriver:
             ...             driver = TinyDbDriver(di)
             ...             driver._throwing_save(test_input_entry_struct)
             False
+
+            5. TinyDbDriver::_throwing_save records the write of the saved struct
+            >>> mock_record_write.reset_mock()
+            >>> with patch.object(TinyDbDriver, '_db', new_callable=PropertyMock) as mock_db:
+            ...     with patch.object(TinyDbDriver, '_get_document_id') as mock_get_document_id:
+            ...         mock_db_instance = setup_mock_db(mock_db)
+            ...         mock_get_document_id.return_value = 42
+            ...         driver = TinyDbDriver(di)
+            ...         _ = driver._throwing_save(test_input_entry_struct)
+            ...         mock_record_write.call_args[0][0]
+            [(42, {'title': 'foo', 'link': 'bar'})]
+            >>> _ = record_write_patcher.stop()
         """
         new_doc_id = self._get_document_id(reading_entry_struct)
+        if self._write_queue is not None:
+            return self._enqueue_save(self._write_queue, new_doc_id, reading_entry_struct)
         document_to_store = Document(reading_entry_struct, new_doc_id)
+        db_signature_before = self._db_signature()
+        write_start = time.perf_counter()
         entry_id = self._db.insert(document_to_store)
-        return True if entry_id else False
+        if not entry_id:
+            return False
+        write_duration = time.perf_counter() - write_start
+        self._has_unwritten_documents = self._deferred_writes
+        self._record_write([(new_doc_id, reading_entry_struct)],
+                           write_duration, db_signature_before)
+        return True
+
+    def _enqueue_save(self,
+                      write_queue: WriteBehindQueue,
+                      doc_id: int,
+                      reading_entry_struct: ReadingEntryStruct) -> bool:
+        """Examples:
+
+            >>> from unittest.mock import MagicMock
+            >>> di = dict()
+            >>> test_input_entry_struct = dict(title='foo', link='bar')
+            >>> def get_test_queue(queued):
+            ...     mock_queue = MagicMock()
+            ...     mock_queue.__contains__.return_value = queued
+            ...     return mock_queue
+
+            1. TinyDbDriver::_enqueue_save puts a new document on the write queue
+            >>> driver = TinyDbDriver(di)
+            >>> mock_queue = get_test_queue(queued=False)
+            >>> driver._enqueue_save(mock_queue, 42, test_input_entry_struct)
+            True
+            >>> mock_queue.put.assert_called_once_with(42, test_input_entry_struct)
+
+            2. TinyDbDriver::_enqueue_save raises a ValueError if the document is already queued
+            >>> driver = TinyDbDriver(di)
+            >>> driver._enqueue_save(get_test_queue(queued=True), 42, test_input_entry_struct)
+            Traceback (most recent call last):
+                ...
+            ValueError: ...
+        """
+        # The database is not read here, that is what the queue saves: a document
+        # which is already stored is acknowledged, and skipped once it is flushed
+        if doc_id in write_queue:
+            raise ValueError(f'Document with id "{doc_id}" already exists.')
+        write_queue.put(doc_id, reading_entry_struct)
+        return True
+
+    def _insert_documents(self, documents: List[Document]) -> None:
+        """Examples:
+
+            >>> import os, tempfile
+            >>> from unittest.mock import PropertyMock, patch
+            >>> di = dict()
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.json')
+            >>> def get_test_driver(mock_db):
+            ...     mock_db.return_value = TinyDB(location)
+            ...     driver = TinyDbDriver(di)
+            ...     driver._attach_sidecars(location)
+            ...     return driver
+
+            1. TinyDbDriver::_insert_documents stores all documents with their own ids
+            >>> with patch.object(TinyDbDriver, '_db', new_callable=PropertyMock) as mock_db:
+            ...     driver = get_test_driver(mock_db)
+            ...     driver._insert_documents([Document(dict(title='foo', link=''), 7),
+            ...                               Document(dict(title='bar', link=''), 9)])
+            ...     sorted(doc.doc_id for doc in driver._db.all())
+            [7, 9]
+
+            2. TinyDbDriver::_insert_documents skips the documents which are already stored
+            >>> with patch.object(TinyDbDriver, '_db', new_callable=PropertyMock) as mock_db:
+            ...     driver = get_test_driver(mock_db)
+            ...     driver._insert_documents([Document(dict(title='zed', link=''), 7)])
+            ...     driver._db.get(doc_id=7)['title']
+            'foo'
+
+            3. TinyDbDriver::_insert_documents writes deferred writes through
+                before the records leave the write-ahead log, so a crash loses no entry
+            >>> from tinydb.storages import JSONStorage
+            >>> from reading_list.shared.config import (Config, DbDriverConfigOptions,
+            ...                                         TinyDbConfig, TinyDbWriteQueueConfig)
+            >>> directory = tempfile.mkdtemp()
+            >>> configs = Config()
+            >>> configs.db = DbDriverConfigOptions()
+            >>> configs.db.tiny_db = TinyDbConfig()
+            >>> configs.db.tiny_db.location = os.path.join(directory, 'test.json')
+            >>> configs.db.tiny_db.deferred_writes = True
+            >>> configs.db.tiny_db.write_queue = TinyDbWriteQueueConfig()
+            >>> configs.db.tiny_db.write_queue.enabled = True
+            >>> configs.db.tiny_db.write_queue.wal_location = os.path.join(directory, 'test.wal')
+            >>> configs.db.tiny_db.write_queue.batch_size = 2
+            >>> driver = TinyDbDriver(dict(app_configs=configs))
+            >>> (driver.save(dict(title='foo', link='')), driver.save(dict(title='bar', link='')))
+            (True, True)
+            >>> # The process crashes here: neither the queue nor the database is closed
+            >>> stored = JSONStorage(configs.db.tiny_db.location).read()['_default']
+            >>> sorted(document['title'] for document in stored.values())
+            ['bar', 'foo']
+            >>> os.path.exists(configs.db.tiny_db.write_queue.wal_location)
+            False
+        """
+        inserted_documents: List[Tuple[int, Mapping[str, object]]] = []
+
+        def updater(table: Dict[int, Mapping[str, str]]) -> None:
+            for document in documents:
+                # Queued documents are not checked against the database on put
+                if document.doc_id not in table:
+                    table[document.doc_id] = dict(document)
+                    inserted_documents.append((document.doc_id, document))
+
+        db_signature_before = self._db_signature()
+        write_start = time.perf_counter()
+        # A single read and write of the database for the whole batch.
+        # `insert_multiple` ignores the ids of the documents, so this relies on the private
+        # `Table._update_table` of the pinned tinydb==4.4.0 (see requirements/requirements.txt).
+        self._db.table(self._db.default_table_name)._update_table(updater)
+        if isinstance(self._db.storage, CachingMiddleware):
+            # The write queue discards the records once this returns, deferring the write
+            # any further would lose the acknowledged documents on a crash
+            self._db.storage.flush()  # type: ignore
+        write_duration = time.perf_counter() - write_start
+        self._record_write(inserted_documents, write_duration, db_signature_before)
+
+    def _record_write(self,
+                      documents: List[Tuple[int, Mapping[str, object]]],
+                      duration: float,
+                      db_signature_before: Optional[FileSignature]) -> None:
+        """Examples:
+
+            >>> import os, tempfile
+            >>> from unittest.mock import PropertyMock, patch
+            >>> di = dict()
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.json')
+            >>> def get_test_driver(mock_db):
+            ...     mock_db.return_value = TinyDB(location)
+            ...     driver = TinyDbDriver(di)
+            ...     driver._attach_sidecars(location)
+            ...     return driver
+
+            1. TinyDbDriver::_record_write counts a database without counters once in full
+            >>> with patch.object(TinyDbDriver, '_db', new_callable=PropertyMock) as mock_db:
+            ...     driver = get_test_driver(mock_db)
+            ...     _ = driver._db.insert(Document(dict(title='a', link=''), 97))
+            ...     driver._record_write([(97, dict(title='a', link=''))], 0.5, [0, 0])
+            ...     driver._stats_counter.load(file_signature(location)).entry_count
+            1
+
+            2. TinyDbDriver::_record_write recounts the database
+                if another process changed it since the counters were stored
+            >>> with patch.object(TinyDbDriver, '_db', new_callable=PropertyMock) as mock_db:
+            ...     driver = get_test_driver(mock_db)
+            ...     _ = TinyDB(location).insert(Document(dict(title='b', link=''), 98))
+            ...     signature_before = file_signature(location)
+            ...     _ = driver._db.insert(Document(dict(title='c', link=''), 99))
+            ...     driver._record_write([(99, dict(title='c', link=''))], 0.5, signature_before)
+            ...     driver._stats_counter.load(file_signature(location)).entry_count
+            3
+        """
+        db_signature_after = self._db_signature()
+        is_recorded = self._stats_counter.record_inserts(
+            documents, duration, db_signature_before, db_signature_after)
+        if not is_recorded:
+            # The counters describe another state of the database (or there are none yet),
+            # so the database is counted once in full
+            self._stats_counter.reset(self._all_documents(), db_signature_after, duration)
+        self._record_titles(documents, db_signature_before, db_signature_after)
+
+    def _record_titles(self,
+                       documents: List[Tuple[int, Mapping[str, object]]],
+                       db_signature_before: Optional[FileSignature],
+                       db_signature_after: Optional[FileSignature]) -> None:
+        """Examples:
+
+            >>> import os, tempfile
+            >>> from unittest.mock import PropertyMock, patch
+            >>> di = dict()
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.json')
+            >>> def get_test_driver(mock_db):
+            ...     mock_db.return_value = TinyDB(location)
+            ...     driver = TinyDbDriver(di)
+            ...     driver._attach_sidecars(location)
+            ...     return driver
+
+            1. TinyDbDriver::_record_titles does not index a database without an index,
+                it is built on the first lookup instead
+            >>> with patch.object(TinyDbDriver, '_db', new_callable=PropertyMock) as mock_db:
+            ...     driver = get_test_driver(mock_db)
+            ...     _ = driver._db.insert(Document(dict(title='Clean Code', link=''), 1))
+            ...     with patch.object(TinyDbDriver, '_all_documents') as mock_all_documents:
+            ...         driver._record_titles([(1, dict(title='Clean Code', link=''))],
+            ...                               [0, 0], file_signature(location))
+            ...         mock_all_documents.called
+            ...     os.path.exists(f'{location}.titles')
+            False
+            False
+
+            2. TinyDbDriver::_record_titles adds the new titles to a current index
+            >>> with patch.object(TinyDbDriver, '_db', new_callable=PropertyMock) as mock_db:
+            ...     driver = get_test_driver(mock_db)
+            ...     _ = driver._get_title_index_store()
+            ...     signature_before = file_signature(location)
+            ...     _ = driver._db.insert(Document(dict(title='Refactoring', link=''), 2))
+            ...     with patch.object(TinyDbDriver, '_all_documents') as mock_all_documents:
+            ...         driver._record_titles([(2, dict(title='Refactoring', link=''))],
+            ...                               signature_before, file_signature(location))
+            ...         mock_all_documents.called
+            ...     len(driver._title_index_store)
+            False
+            2
+
+            3. TinyDbDriver::_record_titles leaves an index of another database state
+                to be rebuilt on the next lookup
+            >>> with patch.object(TinyDbDriver, '_db', new_callable=PropertyMock) as mock_db:
+            ...     driver = get_test_driver(mock_db)
+            ...     driver._db.truncate()
+            ...     signature_before = file_signature(location)
+            ...     _ = driver._db.insert(Document(dict(title='Clean Code', link=''), 1))
+            ...     driver._record_titles([(1, dict(title='Clean Code', link=''))],
+            ...                           signature_before, file_signature(location))
+            ...     is_current = driver._title_index_store.is_current(file_signature(location))
+            ...     (is_current, sorted(driver._get_title_index_store().load()._titles.values()))
+            (False, ['Clean Code'])
+        """
+        entries: List[TitleIndexEntry] = []
+        for doc_id, document in documents:
+            title = str(document['title'])
+            entries.append((doc_id, title, band_keys(title_trigrams(title))))
+        # Only a current index is kept up to date: an index of another state of the database
+        # (or none yet) is rebuilt on the next lookup, never on the write path
+        self._title_index_store.add(entries, db_signature_before, db_signature_after)
+
+    def _build_title_index(self, db_signature: Optional[FileSignature]) -> None:
+        entries: List[TitleIndexEntry] = []
+        for doc_id, document in self._all_documents():
+            title = str(document['title'])
+            entries.append((doc_id, title, band_keys(title_trigrams(title))))
+        self._title_index_store.rebuild(entries, db_signature)
+
+    def _get_title_index_store(self) -> TitleIndexStore:
+        db_signature = self._db_signature()
+        if not self._title_index_store.is_current(db_signature):
+            self._build_title_index(db_signature)
+        return self._title_index_store
+
+    def find_similar_titles(self, title: str, threshold: float) -> List[str]:
+        """Only the titles sharing a band key with the title are read from the index.
+        Queued entries are not looked up until the write queue is flushed.
+
+        Examples:
+
+            >>> import os, tempfile
+            >>> from unittest.mock import PropertyMock, patch
+            >>> di = dict()
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.json')
+            >>> def get_test_driver(mock_db):
+            ...     mock_db.return_value = TinyDB(location)
+            ...     driver = TinyDbDriver(di)
+            ...     driver._attach_sidecars(location)
+            ...     return driver
+
+            1. TinyDbDriver::find_similar_titles returns the similar titles from the index
+            >>> with patch.object(TinyDbDriver, '_db', new_callable=PropertyMock) as mock_db:
+            ...     driver = get_test_driver(mock_db)
+            ...     _ = driver.save(dict(title='The Pragmatic Programmer', link=''))
+            ...     driver.find_similar_titles('Pragmatic Programmer, The (2nd ed)', 0.6)
+            ['The Pragmatic Programmer']
+
+            2. TinyDbDriver::find_similar_titles reindexes the database
+                if it changed since the index was stored
+            >>> os.remove(location)
+            >>> with patch.object(TinyDbDriver, '_db', new_callable=PropertyMock) as mock_db:
+            ...     driver = get_test_driver(mock_db)
+            ...     driver.find_similar_titles('Pragmatic Programmer, The (2nd ed)', 0.6)
+            []
+        """
+        return [similar_title for _, similar_title
+                in self._get_title_index_store().find_similar(title, threshold)]
+
+    def dedupe(self, threshold: float) -> List[List[str]]:
+        """Examples:
+
+            >>> from unittest.mock import patch
+            >>> from reading_list.core.domain.similarity import TitleSimilarityIndex
+            >>> di = dict()
+            >>> title_index = TitleSimilarityIndex()
+            >>> _ = title_index.add(1, 'The Pragmatic Programmer')
+            >>> _ = title_index.add(2, 'Pragmatic Programmer, The (2nd ed)')
+            >>> _ = title_index.add(3, 'Clean Code')
+
+            1. TinyDbDriver::dedupe returns the clusters of similar titles from the index
+            >>> with patch.object(TinyDbDriver, '_get_title_index_store') as mock_get_store:
+            ...     mock_get_store.return_value.load.return_value = title_index
+            ...     driver = TinyDbDriver(di)
+            ...     driver.dedupe(0.6)
+            [['The Pragmatic Programmer', 'Pragmatic Programmer, The (2nd ed)']]
+        """
+        if self._write_queue is not None:
+            self._write_queue.flush()
+        return [[title for _, title in cluster]
+                for cluster in self._get_title_index_store().load().clusters(threshold)]
+
+    def _all_documents(self) -> List[Tuple[int, Mapping[str, object]]]:
+        return [(document.doc_id, document) for document in self._db.all()]
+
+    def stats(self) -> StorageStatsStruct:
+        """Examples:
+
+            >>> import os, tempfile
+            >>> from unittest.mock import PropertyMock, patch
+            >>> di = dict()
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.json')
+            >>> def get_test_driver(mock_db):
+            ...     mock_db.return_value = TinyDB(location)
+            ...     driver = TinyDbDriver(di)
+            ...     driver._attach_sidecars(location)
+            ...     return driver
+
+            1. TinyDbDriver::stats counts an existing database once in full
+            >>> with patch.object(TinyDbDriver, '_db', new_callable=PropertyMock) as mock_db:
+            ...     driver = get_test_driver(mock_db)
+            ...     _ = driver._db.insert(Document(dict(title='a', link=''), 97))
+            ...     driver.stats()['entry_count']
+            1
+
+            2. TinyDbDriver::stats reports the counters maintained on save
+            >>> with patch.object(TinyDbDriver, '_db', new_callable=PropertyMock) as mock_db:
+            ...     driver = get_test_driver(mock_db)
+            ...     _ = driver.save(dict(title='bc', link='x'))
+            ...     with patch.object(TinyDbDriver, '_all_documents') as mock_all_documents:
+            ...         stats = driver.stats()
+            ...         mock_all_documents.called
+            False
+            >>> (stats['entry_count'], stats['average_id_size'], stats['file_size'] > 0)
+            (2, 3.5, True)
+
+            3. TinyDbDriver::stats recounts the database if it changed since the last count
+            >>> os.remove(location)
+            >>> with patch.object(TinyDbDriver, '_db', new_callable=PropertyMock) as mock_db:
+            ...     driver = get_test_driver(mock_db)
+            ...     driver.stats()['entry_count']
+            0
+        """
+        db_signature = self._db_signature()
+        counters = self._stats_counter.load(db_signature)
+        if counters is None:
+            counters = self._stats_counter.reset(self._all_documents(), db_signature)
+        entry_count = counters.entry_count
+        return {
+            'entry_count': entry_count,
+            'file_size': os.path.getsize(self._location) if os.path.exists(
+                self._location) else 0,
+            'average_document_size': (
+                counters.total_document_size / entry_count if entry_count else 0.0),
+            'average_id_size': counters.total_id_size / entry_count if entry_count else 0.0,
+            'last_write_duration': counters.last_write_duration,
+            'write_queue_size': len(self._write_queue) if self._write_queue is not None else 0,
+            'title_index_size': len(self._title_index_store),
+        }
 
     def _get_document_id(self, reading_entry_struct: ReadingEntryStruct) -> int:
         """Examples:
@@ -206,5 +720,7 @@ class TinyDbDriver:
             ...     driver.list()
             ['a', 'b', 'c']
         """
+        if self._write_queue is not None:
+            self._write_queue.flush()
         reading_entry_structs: List[ReadingEntryStruct] = self._db.all()
         return reading_entry_structs
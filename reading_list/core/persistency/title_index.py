@@ -0,0 +1,246 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from reading_list.core.domain.similarity import (TitleSimilarityIndex, band_keys,
+                                                 filter_similar, title_trigrams)
+from reading_list.core.persistency.file_signature import FileSignature
+
+TitleIndexEntry = Tuple[int, str, List[int]]
+
+# Bumped whenever the band keys change, a store of other keys is rebuilt
+INDEX_VERSION = '2'
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS titles (doc_id TEXT PRIMARY KEY, title TEXT NOT NULL);
+    CREATE TABLE IF NOT EXISTS bands (band_key INTEGER NOT NULL, doc_id TEXT NOT NULL);
+    CREATE INDEX IF NOT EXISTS bands_by_key ON bands (band_key);
+    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+class TitleIndexStore:
+    """SQLite store of the title similarity index entries, looked up by MinHash band key:
+    finding the titles similar to a new one reads only the titles sharing a band with it.
+
+    The entries are stored with the signature of the database file they describe
+    (`None` for documents which are not in the database file yet),
+    every update checks and moves it in a single transaction.
+    Document ids are stored as text, they do not fit into SQLite integers.
+    """
+
+    def __init__(self, location: str) -> None:
+        self._location = location
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            # Transactions are opened explicitly, to lock the store for a check and an update
+            connection = sqlite3.connect(self._location, isolation_level=None)
+            try:
+                connection.executescript(SCHEMA)
+            except sqlite3.DatabaseError:
+                # Not an index store (e.g. a corrupted file), it is rebuilt from the database
+                connection.close()
+                os.remove(self._location)
+                connection = sqlite3.connect(self._location, isolation_level=None)
+                connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def _exists(self) -> bool:
+        return self._connection is not None or os.path.exists(self._location)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = self._connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    @staticmethod
+    def _stored_signature(
+            connection: sqlite3.Connection) -> Tuple[bool, Optional[FileSignature]]:
+        meta = dict(connection.execute('SELECT key, value FROM meta'))
+        if meta.get('index_version') != INDEX_VERSION or 'db_signature' not in meta:
+            return False, None
+        return True, json.loads(meta['db_signature'])
+
+    def _write_entries(self,
+                       connection: sqlite3.Connection,
+                       entries: Iterable[TitleIndexEntry],
+                       db_signature: Optional[FileSignature]) -> None:
+        for doc_id, title, keys in entries:
+            connection.execute('INSERT OR REPLACE INTO titles VALUES (?, ?)', (str(doc_id), title))
+            connection.executemany('INSERT INTO bands VALUES (?, ?)',
+                                   [(key, str(doc_id)) for key in keys])
+        connection.execute("INSERT OR REPLACE INTO meta VALUES ('db_signature', ?)",
+                           (json.dumps(db_signature),))
+        connection.execute("INSERT OR REPLACE INTO meta VALUES ('index_version', ?)",
+                           (INDEX_VERSION,))
+
+    def is_current(self, db_signature: Optional[FileSignature]) -> bool:
+        """Examples:
+
+            >>> import tempfile
+            >>> store = TitleIndexStore(os.path.join(tempfile.mkdtemp(), 'test.titles'))
+
+            1. TitleIndexStore::is_current is false for a store which was never built
+            >>> store.is_current(None)
+            False
+
+            2. TitleIndexStore::is_current tells if the store describes the database
+            >>> store.rebuild([], [1, 2])
+            >>> store.is_current([1, 2]), store.is_current([1, 3])
+            (True, False)
+
+            3. TitleIndexStore::is_current is false for a store of other band keys
+            >>> _ = store._connect().execute(
+            ...     "UPDATE meta SET value = '1' WHERE key = 'index_version'")
+            >>> store.is_current([1, 2])
+            False
+        """
+        is_built, stored_signature = self._stored_signature(self._connect())
+        return is_built and stored_signature == db_signature
+
+    def add(self,
+            entries: Iterable[TitleIndexEntry],
+            db_signature_before: Optional[FileSignature],
+            db_signature_after: Optional[FileSignature]) -> bool:
+        """Examples:
+
+            >>> import tempfile
+            >>> store = TitleIndexStore(os.path.join(tempfile.mkdtemp(), 'test.titles'))
+            >>> store.rebuild([(1, 'foo', [10, 11])], [1, 2])
+
+            1. TitleIndexStore::add adds the entries to the store of the same database
+            >>> store.add([(2, 'bar', [12, 13])], [1, 2], [3, 4])
+            True
+            >>> (len(store), store.is_current([3, 4]))
+            (2, True)
+
+            2. TitleIndexStore::add refuses to add entries to a store of another database,
+                which has to be rebuilt instead
+            >>> store.add([(3, 'zed', [14, 15])], [1, 2], [5, 6])
+            False
+            >>> len(store)
+            2
+
+            3. TitleIndexStore::add does not create a store which was never built
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.titles')
+            >>> TitleIndexStore(location).add([(1, 'foo', [10, 11])], None, [1, 2])
+            False
+            >>> os.path.exists(location)
+            False
+        """
+        if not self._exists():
+            return False
+        with self._transaction() as connection:
+            is_built, stored_signature = self._stored_signature(connection)
+            if not is_built or stored_signature != db_signature_before:
+                return False
+            self._write_entries(connection, entries, db_signature_after)
+        return True
+
+    def rebuild(self,
+                entries: Iterable[TitleIndexEntry],
+                db_signature: Optional[FileSignature]) -> None:
+        """Examples:
+
+            >>> import tempfile
+            >>> store = TitleIndexStore(os.path.join(tempfile.mkdtemp(), 'test.titles'))
+            >>> store.rebuild([(1, 'foo', [10, 11])], [1, 2])
+
+            1. TitleIndexStore::rebuild replaces the store contents with the entries
+            >>> store.rebuild([(2, 'bar', [12, 13]), (3, 'zed', [14, 15])], [3, 4])
+            >>> sorted(store.load()._titles.items())
+            [(2, 'bar'), (3, 'zed')]
+        """
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM titles')
+            connection.execute('DELETE FROM bands')
+            self._write_entries(connection, entries, db_signature)
+
+    def confirm(self, db_signature: FileSignature) -> None:
+        """Examples:
+
+            >>> import tempfile
+            >>> store = TitleIndexStore(os.path.join(tempfile.mkdtemp(), 'test.titles'))
+            >>> store.rebuild([(1, 'foo', [10, 11])], None)
+
+            1. TitleIndexStore::confirm ties the entries of not yet written documents
+                to the database file, once they are written
+            >>> store.confirm([1, 2])
+            >>> store.is_current([1, 2])
+            True
+        """
+        self._connect().execute(
+            "UPDATE meta SET value = ? WHERE key = 'db_signature' AND value = 'null'",
+            (json.dumps(db_signature),))
+
+    def find_similar(self, title: str, threshold: float) -> List[Tuple[int, str]]:
+        """Examples:
+
+            >>> import tempfile
+            >>> store = TitleIndexStore(os.path.join(tempfile.mkdtemp(), 'test.titles'))
+            >>> store.rebuild([(doc_id, title, band_keys(title_trigrams(title)))
+            ...                for doc_id, title in [(1, 'The Pragmatic Programmer'),
+            ...                                      (2, 'Clean Code')]], [1, 2])
+
+            1. TitleIndexStore::find_similar returns the near-duplicate titles
+            >>> store.find_similar('Pragmatic Programmer, The (2nd ed)', 0.6)
+            [(1, 'The Pragmatic Programmer')]
+
+            2. TitleIndexStore::find_similar returns nothing for a new title
+            >>> store.find_similar('Structure and Interpretation of Computer Programs', 0.6)
+            []
+        """
+        trigrams = title_trigrams(title)
+        keys = band_keys(trigrams)
+        rows = self._connect().execute(
+            'SELECT DISTINCT titles.doc_id, titles.title FROM bands JOIN titles USING (doc_id) '
+            f'WHERE bands.band_key IN ({", ".join("?" * len(keys))})', keys)
+        return filter_similar(
+            trigrams, [(int(doc_id), similar_title) for doc_id, similar_title in rows], threshold)
+
+    def load(self) -> TitleSimilarityIndex:
+        """Examples:
+
+            >>> import tempfile
+            >>> store = TitleIndexStore(os.path.join(tempfile.mkdtemp(), 'test.titles'))
+
+            1. TitleIndexStore::load restores the index with the stored band keys
+            >>> store.rebuild([(1, 'foo', [10, 11])], [1, 2])
+            >>> index = store.load()
+            >>> (index._titles, index._buckets)
+            ({1: 'foo'}, {10: [1], 11: [1]})
+        """
+        connection = self._connect()
+        keys: Dict[str, List[int]] = {}
+        for key, doc_id in connection.execute('SELECT band_key, doc_id FROM bands'):
+            keys.setdefault(doc_id, []).append(key)
+        index = TitleSimilarityIndex()
+        for doc_id, title in connection.execute('SELECT doc_id, title FROM titles'):
+            index.add(int(doc_id), title, keys.get(doc_id, []))
+        return index
+
+    def __len__(self) -> int:
+        """Examples:
+
+            >>> import tempfile
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.titles')
+
+            1. TitleIndexStore::__len__ counts the stored titles, without creating the store
+            >>> len(TitleIndexStore(location)), os.path.exists(location)
+            (0, False)
+        """
+        if not self._exists():
+            return 0
+        count: int = self._connect().execute('SELECT COUNT(*) FROM titles').fetchone()[0]
+        return count
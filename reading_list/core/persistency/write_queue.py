@@ -0,0 +1,351 @@
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import IO, Callable, Collection, Dict, Iterator, List, Optional, Tuple, cast
+
+from tinydb.table import Document
+
+from reading_list.core.domain.entities import ReadingEntryStruct
+
+
+class WriteAheadLog:
+    """Append-only log of acknowledged, not yet flushed, documents.
+
+    Every record is a single JSON line, fsync-ed before the append returns,
+    so an acknowledged write survives a crash of the process.
+    Processes sharing the log serialize on an exclusive lock of `<location>.lock`,
+    the lock is re-entrant within the log instance.
+    """
+
+    def __init__(self, location: str) -> None:
+        self._location = location
+        self._lock_depth = 0
+        self._lock_file: Optional[IO[bytes]] = None
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Examples:
+
+            >>> import tempfile
+            >>> wal = WriteAheadLog(os.path.join(tempfile.mkdtemp(), 'test.wal'))
+
+            1. WriteAheadLog::locked can be nested within the same log
+            >>> with wal.locked():
+            ...     wal.append(1, dict(title='foo', link='bar'), 10.0)
+            >>> [doc.doc_id for doc, _ in wal.replay()]
+            [1]
+        """
+        if self._lock_depth == 0:
+            self._lock_file = open(f'{self._location}.lock', 'ab')
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0 and self._lock_file is not None:
+                # Closing the file releases the lock
+                self._lock_file.close()
+                self._lock_file = None
+
+    def append(self,
+               doc_id: int,
+               reading_entry_struct: ReadingEntryStruct,
+               logged_at: float) -> None:
+        """Examples:
+
+            >>> import tempfile
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.wal')
+            >>> wal = WriteAheadLog(location)
+
+            1. WriteAheadLog::append writes one JSON line per record
+            >>> wal.append(1, dict(title='foo', link='bar'), 10.0)
+            >>> wal.append(2, dict(title='zed', link=''), 11.0)
+            >>> with open(location) as file:
+            ...     len(file.readlines())
+            2
+
+            2. WriteAheadLog::append starts a new line after a torn record
+            >>> with open(location, 'a') as file:
+            ...     _ = file.write('{"doc_id": 3, "en')
+            >>> wal.append(4, dict(title='bar', link=''), 12.0)
+            >>> [doc.doc_id for doc, _ in wal.replay()]
+            [1, 2, 4]
+        """
+        record = json.dumps(
+            {'doc_id': doc_id, 'entry': reading_entry_struct, 'logged_at': logged_at})
+        with self.locked(), open(self._location, 'a+b') as file:
+            file.seek(0, os.SEEK_END)
+            if file.tell() > 0:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b'\n':
+                    # A crash in the middle of an append left a torn record, it is not continued
+                    record = '\n' + record
+            file.write(record.encode() + b'\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+    def replay(self) -> List[Tuple[Document, float]]:
+        """Examples:
+
+            >>> import tempfile
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.wal')
+            >>> wal = WriteAheadLog(location)
+
+            1. WriteAheadLog::replay returns nothing if the log does not exist
+            >>> wal.replay()
+            []
+
+            2. WriteAheadLog::replay returns the logged records as documents with their log time
+            >>> wal.append(1, dict(title='foo', link='bar'), 10.0)
+            >>> [(doc.doc_id, doc, logged_at) for doc, logged_at in wal.replay()]
+            [(1, {'title': 'foo', 'link': 'bar'}, 10.0)]
+
+            3. WriteAheadLog::replay skips a torn trailing record
+            >>> with open(location, 'a') as file:
+            ...     _ = file.write('{"doc_id": 2, "en')
+            >>> [doc.doc_id for doc, _ in wal.replay()]
+            [1]
+        """
+        with self.locked():
+            if not os.path.exists(self._location):
+                return []
+            with open(self._location) as file:
+                lines = file.readlines()
+        records: List[Tuple[Document, float]] = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash in the middle of an append leaves a partial line,
+                # such a record was never acknowledged so it is safe to drop it.
+                continue
+            records.append((Document(record['entry'], record['doc_id']),
+                            record.get('logged_at', 0.0)))
+        return records
+
+    def discard(self, doc_ids: Collection[int]) -> None:
+        """Examples:
+
+            >>> import tempfile
+            >>> location = os.path.join(tempfile.mkdtemp(), 'test.wal')
+            >>> wal = WriteAheadLog(location)
+            >>> wal.append(1, dict(title='foo', link='bar'), 10.0)
+            >>> wal.append(2, dict(title='zed', link=''), 11.0)
+
+            1. WriteAheadLog::discard drops only the records of the given documents
+            >>> wal.discard({1})
+            >>> [doc.doc_id for doc, _ in wal.replay()]
+            [2]
+
+            2. WriteAheadLog::discard removes the log once no records are left
+            >>> wal.discard({2})
+            >>> os.path.exists(location)
+            False
+        """
+        with self.locked():
+            remaining = [(document, logged_at) for document, logged_at in self.replay()
+                         if document.doc_id not in doc_ids]
+            if not remaining:
+                if os.path.exists(self._location):
+                    os.remove(self._location)
+                return
+            temporary_location = f'{self._location}.tmp'
+            with open(temporary_location, 'w') as file:
+                for document, logged_at in remaining:
+                    file.write(json.dumps({'doc_id': document.doc_id,
+                                           'entry': dict(document),
+                                           'logged_at': logged_at}) + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_location, self._location)
+
+
+class WriteBehindQueue:
+    """Buffers documents in memory (backed by a WriteAheadLog)
+    and hands them over to the flush callback in batches.
+
+    A flush is due once the batch is full or the oldest pending document
+    has waited for the flush interval. It is only checked on `put`, `replay`
+    and `flush_if_due`: there is no timer, so a long-lived process which
+    stops adding has to call `flush_if_due` (or `flush`) itself.
+    The log time is wall clock time, so the interval spans processes.
+
+    A flush holds the lock of the log while the documents are written,
+    and discards only their records: the records appended by other processes
+    in the meantime stay in the log until they are flushed themselves.
+    """
+
+    def __init__(self,
+                 wal: WriteAheadLog,
+                 flush_callback: Callable[[List[Document]], None],
+                 batch_size: int,
+                 flush_interval: float,
+                 clock: Callable[[], float] = time.time) -> None:
+        self._wal = wal
+        self._flush_callback = flush_callback
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._clock = clock
+        self._pending: Dict[int, ReadingEntryStruct] = {}
+        self._oldest_logged_at: Optional[float] = None
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._pending
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _add_pending(self,
+                     doc_id: int,
+                     reading_entry_struct: ReadingEntryStruct,
+                     logged_at: float) -> None:
+        self._pending[doc_id] = reading_entry_struct
+        if self._oldest_logged_at is None or logged_at < self._oldest_logged_at:
+            self._oldest_logged_at = logged_at
+
+    def put(self, doc_id: int, reading_entry_struct: ReadingEntryStruct) -> None:
+        """Examples:
+
+            >>> from unittest.mock import MagicMock
+            >>> def get_test_queue(batch_size=3, flush_interval=60.0):
+            ...     return WriteBehindQueue(
+            ...         MagicMock(), MagicMock(), batch_size, flush_interval, lambda: 0.0)
+
+            1. WriteBehindQueue::put logs the document before acknowledging it
+            >>> queue = get_test_queue()
+            >>> queue.put(1, dict(title='foo', link='bar'))
+            >>> queue._wal.append.assert_called_once_with(1, dict(title='foo', link='bar'), 0.0)
+            >>> 1 in queue
+            True
+
+            2. WriteBehindQueue::put does not flush before the batch is full
+            >>> queue = get_test_queue()
+            >>> queue.put(1, dict(title='foo', link='bar'))
+            >>> queue.put(2, dict(title='zed', link='bar'))
+            >>> queue._flush_callback.called
+            False
+
+            3. WriteBehindQueue::put flushes once the batch is full
+            >>> queue = get_test_queue()
+            >>> for doc_id in range(3):
+            ...     queue.put(doc_id, dict(title=str(doc_id), link=''))
+            >>> queue._flush_callback.call_count
+            1
+            >>> len(queue)
+            0
+
+            4. WriteBehindQueue::put flushes once the oldest document waited for the interval
+            >>> queue = get_test_queue()
+            >>> queue.put(1, dict(title='foo', link='bar'))
+            >>> queue._clock = lambda: 120.0
+            >>> queue.put(2, dict(title='zed', link='bar'))
+            >>> queue._flush_callback.call_count
+            1
+        """
+        logged_at = self._clock()
+        self._wal.append(doc_id, reading_entry_struct, logged_at)
+        self._add_pending(doc_id, reading_entry_struct, logged_at)
+        self.flush_if_due()
+
+    def _is_flush_due(self) -> bool:
+        if self._oldest_logged_at is None:
+            return False
+        is_batch_full = len(self._pending) >= self._batch_size
+        is_interval_passed = self._clock() - self._oldest_logged_at >= self._flush_interval
+        return is_batch_full or is_interval_passed
+
+    def flush_if_due(self) -> None:
+        """Examples:
+
+            >>> from unittest.mock import MagicMock
+            >>> queue = WriteBehindQueue(MagicMock(), MagicMock(), 10, 60.0, lambda: 0.0)
+            >>> queue.put(1, dict(title='foo', link='bar'))
+
+            1. WriteBehindQueue::flush_if_due keeps the documents pending before it is due
+            >>> queue.flush_if_due()
+            >>> (queue._flush_callback.called, len(queue))
+            (False, 1)
+
+            2. WriteBehindQueue::flush_if_due flushes once it is due
+            >>> queue._clock = lambda: 60.0
+            >>> queue.flush_if_due()
+            >>> (queue._flush_callback.called, len(queue))
+            (True, 0)
+        """
+        if self._is_flush_due():
+            self.flush()
+
+    def flush(self) -> None:
+        """Examples:
+
+            >>> from unittest.mock import MagicMock
+            >>> queue = WriteBehindQueue(MagicMock(), MagicMock(), 10, 60.0)
+
+            1. WriteBehindQueue::flush hands all pending documents over at once
+            >>> queue.put(1, dict(title='foo', link='bar'))
+            >>> queue.put(2, dict(title='zed', link=''))
+            >>> queue.flush()
+            >>> [(doc.doc_id, doc) for doc in queue._flush_callback.call_args[0][0]]
+            [(1, {'title': 'foo', 'link': 'bar'}), (2, {'title': 'zed', 'link': ''})]
+
+            2. WriteBehindQueue::flush discards the flushed records from the log
+            >>> queue._wal.discard.assert_called_once_with({1, 2})
+
+            3. WriteBehindQueue::flush discards the records only after the callback succeeds
+            >>> queue._wal.reset_mock()
+            >>> queue.put(3, dict(title='bar', link=''))
+            >>> queue._flush_callback.side_effect = IOError()
+            >>> queue.flush()
+            Traceback (most recent call last):
+                ...
+            OSError
+            >>> queue._wal.discard.called
+            False
+            >>> len(queue)
+            1
+
+            4. WriteBehindQueue::flush does nothing if nothing is pending
+            >>> queue = WriteBehindQueue(MagicMock(), MagicMock(), 10, 60.0)
+            >>> queue.flush()
+            >>> queue._flush_callback.called
+            False
+        """
+        if self._pending:
+            documents = [Document(struct, doc_id) for doc_id, struct in self._pending.items()]
+            # Writers of other processes wait, so they do not write the database concurrently
+            with self._wal.locked():
+                self._flush_callback(documents)
+                self._wal.discard(set(self._pending))
+            self._pending.clear()
+        self._oldest_logged_at = None
+
+    def replay(self) -> None:
+        """Examples:
+
+            >>> from unittest.mock import MagicMock
+            >>> def get_test_queue(logged_at):
+            ...     queue = WriteBehindQueue(MagicMock(), MagicMock(), 10, 60.0, lambda: 100.0)
+            ...     queue._wal.replay.return_value = [
+            ...         (Document(dict(title='foo', link=''), 1), logged_at)]
+            ...     return queue
+
+            1. WriteBehindQueue::replay keeps the recovered documents pending until due
+            >>> queue = get_test_queue(logged_at=90.0)
+            >>> queue.replay()
+            >>> (queue._flush_callback.called, 1 in queue)
+            (False, True)
+
+            2. WriteBehindQueue::replay flushes the recovered documents once due
+            >>> queue = get_test_queue(logged_at=10.0)
+            >>> queue.replay()
+            >>> [doc.doc_id for doc in queue._flush_callback.call_args[0][0]]
+            [1]
+            >>> queue._wal.discard.assert_called_once_with({1})
+        """
+        for document, logged_at in self._wal.replay():
+            self._add_pending(
+                document.doc_id, cast(ReadingEntryStruct, dict(document)), logged_at)
+        self.flush_if_due()
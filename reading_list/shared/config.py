@@ -1,7 +1,9 @@
 import json
 import os
 from inspect import getmembers
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+
+from reading_list.core.domain.links import DEFAULT_STRIPPED_QUERY_PARAMS
 
 
 class AConfig:
@@ -9,16 +11,50 @@ class AConfig:
     ...
 
 
+class ConfigurationError(ValueError):
+    """Raised when a configured value is not supported."""
+    ...
+
+
+class TinyDbWriteQueueConfig(AConfig):
+    enabled: bool = os.getenv('RL_TINY_DB_WRITE_QUEUE_ENABLED', 'false').lower() == 'true'
+    wal_location: str = os.getenv('RL_TINY_DB_WRITE_QUEUE_WAL_LOCATION', '')
+    batch_size: int = int(os.getenv('RL_TINY_DB_WRITE_QUEUE_BATCH_SIZE', '64'))
+    flush_interval: float = float(os.getenv('RL_TINY_DB_WRITE_QUEUE_FLUSH_INTERVAL', '2.0'))
+
+
 class TinyDbConfig(AConfig):
     location: str = os.getenv('RL_TINY_DB_LOCATION', './db.json')
+    storage: str = os.getenv('RL_TINY_DB_STORAGE', 'json')
+    deferred_writes: bool = os.getenv('RL_TINY_DB_DEFERRED_WRITES', 'false').lower() == 'true'
+    write_queue: TinyDbWriteQueueConfig = TinyDbWriteQueueConfig()
 
 
 class DbDriverConfigOptions(AConfig):
     tiny_db: TinyDbConfig = TinyDbConfig()
 
 
+class LinkCanonicalizationConfig(AConfig):
+    stripped_query_params: List[str] = os.getenv(
+        'RL_LINKS_STRIPPED_QUERY_PARAMS', ','.join(DEFAULT_STRIPPED_QUERY_PARAMS)).split(',')
+    sort_query_keys: bool = os.getenv('RL_LINKS_SORT_QUERY_KEYS', 'true').lower() == 'true'
+    lowercase_host: bool = os.getenv('RL_LINKS_LOWERCASE_HOST', 'true').lower() == 'true'
+    strip_www: bool = os.getenv('RL_LINKS_STRIP_WWW', 'true').lower() == 'true'
+    strip_trailing_slash: bool = os.getenv(
+        'RL_LINKS_STRIP_TRAILING_SLASH', 'true').lower() == 'true'
+    upgrade_scheme: bool = os.getenv('RL_LINKS_UPGRADE_SCHEME', 'true').lower() == 'true'
+    memo_size: int = int(os.getenv('RL_LINKS_MEMO_SIZE', '4096'))
+
+
+class SimilarityConfig(AConfig):
+    threshold: float = float(os.getenv('RL_SIMILARITY_THRESHOLD', '0.6'))
+    check_on_add: bool = os.getenv('RL_SIMILARITY_CHECK_ON_ADD', 'false').lower() == 'true'
+
+
 class Config(AConfig):
     db: DbDriverConfigOptions = DbDriverConfigOptions()
+    links: LinkCanonicalizationConfig = LinkCanonicalizationConfig()
+    similarity: SimilarityConfig = SimilarityConfig()
 
 
 DEFAULT_CONFIGS = Config()